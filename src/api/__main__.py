@@ -1,10 +1,13 @@
-import uvicorn
+import sys
 
 from src.api.app import create_app
 from src.core.config import load_settings
 
 
 def main() -> None:
+    # Импортируем здесь, чтобы импорт приложения не тянул за собой сервер
+    import uvicorn
+
     settings = load_settings()
     app = create_app(settings)
 
@@ -14,6 +17,10 @@ def main() -> None:
         port=settings.http_port,
         reload=settings.reload,  # safe for local/dev only
         log_level=settings.log_level.lower(),
+        # uvloop и httptools приходят с uvicorn[standard]; uvloop нет под Windows
+        loop="auto" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        lifespan="on",
     )
 
 
@@ -1,18 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.gzip import GZipMiddleware
 
 from src.api.lifespan import build_lifespan
 from src.api.v1.routers import api_v1
 from src.api.middleware import AuthMiddleware
 from src.core.config import Settings, load_settings
+from src.core.errors import register_exception_handlers
 from src.core.logging import init_logging
 
 
 def create_app(settings: Settings | None = None) -> FastAPI:
 
     settings = settings or load_settings()
-    init_logging(level=settings.log_level)
+    init_logging(level=settings.log_level, rich_tracebacks=settings.log_rich_tracebacks)
 
     app = FastAPI(
         title=settings.app_name,
@@ -20,11 +22,23 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         docs_url="/docs" if settings.enable_docs else None,
         redoc_url=None,
         openapi_url="/openapi.json" if settings.enable_docs else None,
+        swagger_ui_oauth2_redirect_url="/docs/oauth2-redirect" if settings.enable_docs else None,
         lifespan=build_lifespan(settings),
+        default_response_class=ORJSONResponse,
     )
+    if not settings.enable_docs:
+        # Схема не нужна: не строим модели fastapi.openapi даже по запросу
+        app.openapi = lambda: {}
 
     # Middlewares
-    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    # Ответы auth маленькие: сжимаем только крупные и самым быстрым уровнем.
+    # В prod за nginx/Envoy сжатие лучше отдать прокси (ENABLE_GZIP=false)
+    if settings.enable_gzip:
+        app.add_middleware(
+            GZipMiddleware,
+            minimum_size=settings.gzip_minimum_size,
+            compresslevel=settings.gzip_compresslevel,
+        )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_allow_origins,
@@ -36,6 +50,9 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     # Добавляем middleware аутентификации
     app.add_middleware(AuthMiddleware, settings=settings)
 
+    # Ошибки AppError/ValueError отдаем как problem+json
+    register_exception_handlers(app)
+
     # Routers
     app.include_router(api_v1, prefix="/api")
 
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from starlette.types import Scope
+
+
+def get_raw_header(scope: Scope, name: bytes) -> Optional[bytes]:
+    """Первое значение заголовка из ASGI scope (name - в нижнем регистре)"""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def get_cookie(cookie_header: bytes, name: bytes) -> Optional[str]:
+    """Значение одной куки из сырого заголовка Cookie без разбора всего набора"""
+    prefix = name + b"="
+    for part in cookie_header.split(b";"):
+        part = part.lstrip()
+        if part.startswith(prefix):
+            value = part[len(prefix):]
+            return value.decode("latin-1") if value else None
+    return None
@@ -1,26 +1,31 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Annotated
+from typing import TYPE_CHECKING, AsyncIterator, Annotated
 
 from fastapi import Depends, HTTPException, Request, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.core.config import Settings
 from src.core.logging import get_logger
 
 from src.application.uow import UnitOfWork  # interface / Protocol
+from src.application.use_cases.auth_use_cases import LoginUseCase, RefreshTokenUseCase
+from src.application.use_cases.register_use_cases import RegisterUseCase
 from src.infrastructure.uow_sqlalchemy import SQLAlchemyUoW  # impl
+from src.domain.entities import User
 from src.domain.services import PasswordService, JWTService, AuthService
-from src.infrastructure.persistence.repositories import SQLUserRepository
-from src.infrastructure.mq.publisher import EventPublisher
+from src.infrastructure.persistence.repositories import CachedUserRepository, SQLUserRepository
+
+if TYPE_CHECKING:
+    from src.infrastructure.mq.publisher import EventPublisher
 
 log = get_logger(__name__)
 
-bearer_scheme = HTTPBearer(auto_error=False)
+# Зависимости без блокирующей работы объявляем async: FastAPI вызывает их
+# прямо в event loop, а обычные def отправляет в threadpool
 
-def get_settings(request: Request) -> Settings:
+async def get_settings(request: Request) -> Settings:
 
     settings: Settings = request.app.state.settings
     return settings
@@ -40,14 +45,16 @@ def _get_session_factory(request: Request) -> async_sessionmaker[AsyncSession]:
 
 async def get_session(request: Request) -> AsyncIterator[AsyncSession]:
 
+    # FastAPI кеширует зависимость в пределах запроса: все, кто зависит
+    # от get_session (SessionDep, UoWDep, репозитории), получают одну сессию
     session_factory = _get_session_factory(request)
     async with session_factory() as session:
         yield session
 
-def get_uow(request: Request) -> UnitOfWork:
+async def get_uow(session: SessionDep) -> UnitOfWork:
 
-    session_factory = _get_session_factory(request)
-    return SQLAlchemyUoW(session_factory)
+    # UoW поверх сессии запроса, а не второй checkout соединения из пула
+    return SQLAlchemyUoW.from_existing_session(session)
 
 @asynccontextmanager
 async def request_scoped_uow(session: AsyncSession) -> AsyncIterator[UnitOfWork]:
@@ -66,70 +73,111 @@ async def get_uow_scoped(
     async with request_scoped_uow(session) as uow:
         yield uow
 
-async def get_current_token(
-    creds: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
-) -> str:
+async def get_current_token(request: Request) -> str:
+
+    # AuthMiddleware уже извлек токен из куки или заголовка Authorization
+    token: str | None = getattr(request.state, "access_token", None)
+    if token is not None:
+        return token
 
-    return "" if creds is None else creds.credentials
+    # Публичный эндпоинт - middleware токен не искал
+    auth_header = request.headers.get("authorization", "")
+    return auth_header[7:] if auth_header.startswith("Bearer ") else ""
 
 
-def get_password_service(settings: Settings = Depends(get_settings)) -> PasswordService:
+async def get_password_service(request: Request) -> PasswordService:
     """Получить сервис для работы с паролями"""
-    return PasswordService()
+    password_service: PasswordService = request.app.state.password_service
+    return password_service
 
 
-def get_jwt_service(settings: Settings = Depends(get_settings)) -> JWTService:
+async def get_jwt_service(request: Request) -> JWTService:
     """Получить сервис для работы с JWT"""
-    return JWTService(settings)
+    jwt_service: JWTService = request.app.state.jwt_service
+    return jwt_service
 
 
-def get_auth_service(
-    password_service: PasswordService = Depends(get_password_service),
-    jwt_service: JWTService = Depends(get_jwt_service)
-) -> AuthService:
+async def get_auth_service(request: Request) -> AuthService:
     """Получить сервис аутентификации"""
-    return AuthService(password_service, jwt_service)
-
-
-def get_auth_services(
-    password_service: PasswordService = Depends(get_password_service),
-    jwt_service: JWTService = Depends(get_jwt_service),
-    auth_service: AuthService = Depends(get_auth_service)
-) -> dict:
-    """Получить все сервисы аутентификации"""
-    return {
-        "password_service": password_service,
-        "jwt_service": jwt_service,
-        "auth_service": auth_service
-    }
+    auth_service: AuthService = request.app.state.auth_service
+    return auth_service
 
 
-def get_user_repo(session: SessionDep) -> SQLUserRepository:
+async def get_user_repo(session: SessionDep) -> CachedUserRepository:
     """Получить репозиторий пользователей"""
-    return SQLUserRepository(session)
+    return CachedUserRepository(SQLUserRepository(session))
 
 
-def get_event_publisher(request: Request) -> EventPublisher | None:
+async def get_event_publisher(request: Request) -> EventPublisher | None:
     """Получить EventPublisher из app state"""
     publisher: EventPublisher | None = getattr(request.app.state, "event_publisher", None)
     return publisher
 
 
+# Use cases держат репозиторий поверх сессии запроса, поэтому синглтонами
+# быть не могут; собираем их в одной зависимости прямо из app state -
+# FastAPI разрешает одну зависимость вместо четырех на каждый запрос
+
+async def get_login_uc(
+    request: Request,
+    user_repo: Annotated[CachedUserRepository, Depends(get_user_repo)],
+) -> LoginUseCase:
+    """Use case входа для текущего запроса"""
+    state = request.app.state
+    return LoginUseCase(
+        user_repo=user_repo,
+        auth_service=state.auth_service,
+        jwt_service=state.jwt_service,
+        event_publisher=getattr(state, "event_publisher", None),
+    )
+
+
+async def get_refresh_uc(
+    request: Request,
+    user_repo: Annotated[CachedUserRepository, Depends(get_user_repo)],
+) -> RefreshTokenUseCase:
+    """Use case обновления токенов для текущего запроса"""
+    state = request.app.state
+    return RefreshTokenUseCase(
+        user_repo=user_repo,
+        jwt_service=state.jwt_service,
+        event_publisher=getattr(state, "event_publisher", None),
+    )
+
+
+async def get_register_uc(
+    request: Request,
+    user_repo: Annotated[CachedUserRepository, Depends(get_user_repo)],
+) -> RegisterUseCase:
+    """Use case регистрации для текущего запроса"""
+    state = request.app.state
+    return RegisterUseCase(
+        user_repo=user_repo,
+        auth_service=state.auth_service,
+        jwt_service=state.jwt_service,
+        event_publisher=getattr(state, "event_publisher", None),
+    )
+
+
 async def require_authenticated_user(
+    request: Request,
     token: Annotated[str, Depends(get_current_token)],
-    settings: SettingsDep,
+    jwt_service: Annotated[JWTService, Depends(get_jwt_service)],
 ) -> dict:
     """Проверка аутентификации пользователя"""
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing bearer token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # Токен уже проверен в AuthMiddleware
+    payload: dict | None = getattr(request.state, "jwt_payload", None)
+    if payload is None:
+        # Эндпоинт в обход middleware - проверяем токен сами
+        if not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Missing bearer token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        payload = jwt_service.verify_access_token(token)
 
-    # Проверяем JWT токен
-    jwt_service = JWTService(settings)
-    payload = jwt_service.verify_access_token(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -145,7 +193,56 @@ async def require_authenticated_user(
     }
 
 
+async def current_user(
+    request: Request,
+    token: Annotated[str, Depends(get_current_token)],
+    user_repo: Annotated[CachedUserRepository, Depends(get_user_repo)],
+    jwt_service: Annotated[JWTService, Depends(get_jwt_service)],
+) -> User:
+    """Текущий активный пользователь (FastAPI кеширует результат на запрос)"""
+    # Токен уже проверен в AuthMiddleware
+    payload: dict | None = getattr(request.state, "jwt_payload", None)
+    if payload is None and token:
+        payload = jwt_service.verify_access_token(token)
+
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+
+    user_id = payload.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload"
+        )
+
+    try:
+        user = await user_repo.get_by_id(user_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token verification failed"
+        )
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is deactivated"
+        )
+
+    return user
+
+
 SettingsDep = Annotated[Settings, Depends(get_settings)]
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
 UoWDep = Annotated[UnitOfWork, Depends(get_uow)]
 CurrentUserDep = Annotated[dict, Depends(require_authenticated_user)]
+ActiveUserDep = Annotated[User, Depends(current_user)]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from typing import Callable, Optional
+
+from cachetools import TTLCache
+
+from src.domain.services import JWTService
+
+_CACHE_MAXSIZE = 10_000
+# Refresh токен предъявляется раз в несколько минут - большой кеш не нужен
+_REFRESH_CACHE_MAXSIZE = 1024
+_CACHE_TTL_SECONDS = 30
+# Запас до exp: почти истекший токен проверяем заново, а не из кеша
+_EXP_MARGIN_SECONDS = 5
+# Наши access токены на порядки короче; длиннее - заведомо мусор
+_MAX_TOKEN_LENGTH = 8192
+
+
+class TokenCache:
+    """Ограниченный TTL-кеш успешно проверенных JWT (ключ - blake2b токена)"""
+
+    def __init__(self, maxsize: int = _CACHE_MAXSIZE, ttl: float = _CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._cache = TTLCache[bytes, tuple[dict, float]](maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes, now: float) -> Optional[dict]:
+        """Получить payload, если запись есть и токен еще не истек"""
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at <= now:
+            return None
+        return payload
+
+    def set(self, key: bytes, payload: dict, now: float) -> None:
+        """Сохранить payload не дольше, чем до истечения самого токена"""
+        expires_at = now + self.ttl
+        exp = payload.get("exp")
+        if exp is not None:
+            expires_at = min(float(exp) - _EXP_MARGIN_SECONDS, expires_at)
+        with self._lock:
+            self._cache[key] = (payload, expires_at)
+
+
+# Общие кеши для middleware, зависимостей и use cases
+access_token_cache = TokenCache()
+refresh_token_cache = TokenCache(maxsize=_REFRESH_CACHE_MAXSIZE)
+
+
+def _looks_like_jwt(token: str) -> bool:
+    """Дешевая проверка формы header.payload.signature до base64/JSON разбора"""
+    return len(token) < _MAX_TOKEN_LENGTH and token.count(".") == 2
+
+
+def _verify_cached(
+    cache: TokenCache, verify: Callable[[str], Optional[dict]], token: str
+) -> Optional[dict]:
+    """Проверка токена через кеш; в кеш попадают только успешные результаты"""
+    if not _looks_like_jwt(token):
+        return None
+
+    # blake2b с 16-байтным дайджестом быстрее sha256 и достаточен как ключ
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+
+    payload = cache.get(key, now)
+    if payload is not None:
+        return payload
+
+    payload = verify(token)
+    if payload:
+        cache.set(key, payload, now)
+    return payload
+
+
+class CachedJWTService(JWTService):
+    """JWTService, повторно не проверяющий подпись уже проверенных токенов"""
+
+    def verify_access_token(self, token: str) -> Optional[dict]:
+        """Проверка access токена с кешированием"""
+        return _verify_cached(access_token_cache, super().verify_access_token, token)
+
+    def verify_refresh_token(self, token: str) -> Optional[dict]:
+        """Проверка refresh токена с кешированием"""
+        return _verify_cached(refresh_token_cache, super().verify_refresh_token, token)
@@ -1,14 +1,20 @@
+from __future__ import annotations
+
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import TYPE_CHECKING, AsyncIterator
 import asyncio
 
 from fastapi import FastAPI
 
 from src.core.config import Settings
-from src.core.db import init_engine, close_engine, init_session_factory
+from src.core.db import init_engine, close_engine, init_session_factory, warmup_pool
 from src.core.logging import get_logger
-from src.infrastructure.mq.publisher import EventPublisher
-from src.infrastructure.mq.consumer import EventConsumer
+from src.api.jwt_cache import CachedJWTService
+from src.domain.services import AuthService, PasswordService
+
+if TYPE_CHECKING:
+    from src.infrastructure.mq.consumer import EventConsumer
+    from src.infrastructure.mq.publisher import EventPublisher
 
 log = get_logger(__name__)
 
@@ -21,6 +27,32 @@ async def start_consumer(consumer: EventConsumer):
         log.error(f"Consumer error: {e}")
 
 
+async def _connect_publisher(settings: Settings) -> EventPublisher:
+    """Подключение publisher к RabbitMQ"""
+    # MQ импортируем лениво: приложение без брокера не тянет aio_pika
+    from src.infrastructure.mq.publisher import EventPublisher
+
+    publisher = EventPublisher(settings)
+    await publisher.connect()
+    return publisher
+
+
+async def _connect_consumer(settings: Settings) -> EventConsumer:
+    """Подключение consumer к RabbitMQ"""
+    from src.infrastructure.mq.consumer import EventConsumer
+
+    consumer = EventConsumer(settings)
+    await consumer.connect()
+    return consumer
+
+
+async def _close_consumer_connection() -> None:
+    """Закрыть общее соединение consumer с RabbitMQ"""
+    from src.infrastructure.mq.consumer import close_connection
+
+    await close_connection()
+
+
 def build_lifespan(settings: Settings):
 
     @asynccontextmanager
@@ -28,42 +60,84 @@ def build_lifespan(settings: Settings):
         # --- Startup ---
         log.info("Starting service...", extra={"app": settings.app_name, "env": settings.env})
 
-        # DB engine & session factory
-        engine = await init_engine(settings.database_url, echo=settings.sql_echo)
+        # Сервисы без состояния - один экземпляр на приложение
+        app.state.password_service = PasswordService(rounds=settings.bcrypt_rounds)
+        # Кеширующая обертка: /me, /refresh и RefreshTokenUseCase не проверяют
+        # подпись повторно для уже встречавшихся токенов
+        app.state.jwt_service = CachedJWTService(settings)
+        app.state.auth_service = AuthService(app.state.password_service, app.state.jwt_service)
+
+        # DB engine и подключения к RabbitMQ независимы - поднимаем их параллельно
+        engine, event_publisher, event_consumer = await asyncio.gather(
+            init_engine(
+                settings.database_url,
+                echo=settings.sql_echo,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_timeout=settings.db_pool_timeout,
+                pool_recycle=settings.db_pool_recycle,
+            ),
+            _connect_publisher(settings),
+            _connect_consumer(settings),
+            return_exceptions=True,
+        )
+
+        if isinstance(event_publisher, BaseException):
+            log.warning(
+                f"Failed to connect RabbitMQ publisher: {event_publisher}. "
+                "Events will not be published."
+            )
+            event_publisher = None
+        else:
+            log.info("RabbitMQ publisher connected")
+
+        if isinstance(event_consumer, BaseException):
+            log.warning(
+                f"Failed to start RabbitMQ consumer: {event_consumer}. "
+                "Events will not be consumed."
+            )
+            event_consumer = None
+
+        # Без БД сервис не работает - освобождаем MQ и падаем
+        if isinstance(engine, BaseException):
+            for conn in (event_consumer, event_publisher):
+                if conn:
+                    await conn.close()
+            # Соединение могло открыться, даже если канал consumer не создался
+            await _close_consumer_connection()
+            raise engine
+
+        try:
+            await warmup_pool(engine, settings.db_pool_warmup, settings.db_pool_size)
+        except Exception as e:
+            # Прогрев - оптимизация: соединения откроются при первых запросах
+            log.warning(f"DB pool warmup failed: {e}")
+
+        log.info(
+            "DB pool configured",
+            extra={
+                "pool": engine.pool.status(),
+                "pool_size": settings.db_pool_size,
+                "max_overflow": settings.db_max_overflow,
+            },
+        )
         sf = init_session_factory(engine)
-        init_session_factory(engine)
         app.state.engine = engine
         app.state.session_factory = sf
         app.state.ready = True
 
-        # RabbitMQ Publisher
-        event_publisher = None
-        try:
-            event_publisher = EventPublisher(settings)
-            await event_publisher.connect()
-            app.state.event_publisher = event_publisher
-            log.info("RabbitMQ publisher connected")
-        except Exception as e:
-            log.warning(f"Failed to connect RabbitMQ publisher: {e}. Events will not be published.")
-            app.state.event_publisher = None
+        app.state.event_publisher = event_publisher
 
         # RabbitMQ Consumer (опционально, если нужно слушать события)
-        event_consumer = None
         consumer_task = None
-        try:
-            event_consumer = EventConsumer(settings)
-            await event_consumer.connect()
-            
+        if event_consumer:
             # Регистрируем обработчики событий (пример)
             # event_consumer.register_handler("user_deleted", handle_user_deleted)
-            
+
             # Запускаем consumer в фоновой задаче
             consumer_task = asyncio.create_task(start_consumer(event_consumer))
-            app.state.event_consumer = event_consumer
             log.info("RabbitMQ consumer started")
-        except Exception as e:
-            log.warning(f"Failed to start RabbitMQ consumer: {e}. Events will not be consumed.")
-            app.state.event_consumer = None
+        app.state.event_consumer = event_consumer
 
         log.info("Service is up")
 
@@ -87,6 +161,11 @@ def build_lifespan(settings: Settings):
                     await event_consumer.close()
                 except Exception as e:
                     log.error(f"Error closing consumer: {e}")
+            # Общее соединение закрываем и при неудачном старте consumer
+            try:
+                await _close_consumer_connection()
+            except Exception as e:
+                log.error(f"Error closing consumer connection: {e}")
 
             # Закрываем publisher
             if event_publisher:
@@ -98,6 +177,8 @@ def build_lifespan(settings: Settings):
             # Close DB engine
             await close_engine(engine)
 
+            app.state.password_service.close()
+
             log.info("Bye")
 
     return lifespan
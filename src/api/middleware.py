@@ -1,69 +1,96 @@
 from __future__ import annotations
 
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from src.api.cookies import get_cookie
+from src.api.jwt_cache import CachedJWTService
 from src.core.config import Settings
-from src.domain.services import JWTService
 
+# Эндпоинты, доступные без аутентификации
+PUBLIC_PATH_PREFIXES: tuple[str, ...] = (
+    "/api/v1/healthz",
+    "/api/v1/auth/login",
+    "/api/v1/auth/register",
+    "/api/v1/auth/refresh",
+    "/api/v1/auth/logout",
+    "/docs",
+    "/openapi.json",
+    "/redoc",
+)
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Middleware для аутентификации пользователей"""
-    
-    def __init__(self, app, settings: Settings):
-        super().__init__(app)
+
+class AuthMiddleware:
+    """Middleware для аутентификации пользователей (чистый ASGI)"""
+
+    def __init__(self, app: ASGIApp, settings: Settings):
+        self.app = app
         self.settings = settings
-        self.jwt_service = JWTService(settings)
-    
-    async def dispatch(self, request: Request, call_next):
+        self.jwt_service = CachedJWTService(settings)
+        self._public_prefixes: tuple[str, ...] = PUBLIC_PATH_PREFIXES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Обработка запроса с проверкой аутентификации"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Пропускаем публичные эндпоинты
-        if self._is_public_endpoint(request.url.path):
-            return await call_next(request)
-        
-        # Пытаемся получить токен из кук или заголовка Authorization
+        if self._is_public_endpoint(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        # Пытаемся получить токен из кук или заголовка Authorization,
+        # просматривая сырые заголовки один раз
+        cookie_header = None
+        auth_header = None
+        for key, value in scope["headers"]:
+            if key == b"cookie" and cookie_header is None:
+                cookie_header = value
+            elif key == b"authorization" and auth_header is None:
+                auth_header = value
+
         token = None
-        
+
         # 1. Проверяем куки (приоритет для HTTP-only)
-        access_token_cookie = request.cookies.get("access_token")
-        if access_token_cookie:
-            token = access_token_cookie
-        
+        if cookie_header:
+            token = get_cookie(cookie_header, b"access_token")
+
         # 2. Если нет в куках, проверяем заголовок Authorization
+        if not token and auth_header and auth_header.startswith(b"Bearer "):
+            token = auth_header[7:].decode("latin-1") or None
+
         if not token:
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-        
-        if not token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Missing or invalid authorization"
-            )
-        
+            await self._unauthorized(scope, receive, send, "Missing or invalid authorization")
+            return
+
         # Проверяем токен
         payload = self.jwt_service.verify_access_token(token)
         if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
-        
-        # Добавляем информацию о пользователе в request state
-        request.state.user_id = payload.get("sub")
-        request.state.user_email = payload.get("email")
-        
-        return await call_next(request)
-    
+            await self._unauthorized(scope, receive, send, "Invalid or expired token")
+            return
+
+        # Добавляем информацию о пользователе в request state,
+        # чтобы зависимости и обработчики не проверяли токен повторно
+        state = scope.setdefault("state", {})
+        state["access_token"] = token
+        state["jwt_payload"] = payload
+        state["user_id"] = payload.get("sub")
+        state["user_email"] = payload.get("email")
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _unauthorized(scope: Scope, receive: Receive, send: Send, detail: str) -> None:
+        """Ответ 401 в том же формате, что и HTTPException"""
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status.HTTP_401_UNAUTHORIZED,
+        )
+        await response(scope, receive, send)
+
     def _is_public_endpoint(self, path: str) -> bool:
         """Проверка, является ли эндпоинт публичным"""
-        public_paths = [
-            "/api/v1/healthz",
-            "/api/v1/auth/login",
-            "/api/v1/auth/register",
-            "/api/v1/auth/refresh",
-            "/docs",
-            "/openapi.json",
-            "/redoc"
-        ]
-        return any(path.startswith(public_path) for public_path in public_paths)
+        # str.startswith с кортежем перебирает префиксы на уровне C
+        return path.startswith(self._public_prefixes)
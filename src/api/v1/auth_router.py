@@ -1,34 +1,43 @@
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, HTTPException, status, Response, Depends, Request
 
 from src.application.dto import (
-    LoginRequest, AuthResponse, TokenResponse, UserResponse, RegisterRequest
+    LoginRequest, AuthResponse, TokenResponse, UserResponse, RegisterRequest,
+    UserLoggedOutEvent
 )
 from src.application.use_cases.auth_use_cases import (
     LoginUseCase, RefreshTokenUseCase
 )
-from src.api.deps import get_user_repo, get_auth_services, get_jwt_service, get_event_publisher
+from src.api.cookies import get_cookie, get_raw_header
+from src.api.deps import (
+    ActiveUserDep, get_event_publisher, get_jwt_service,
+    get_login_uc, get_refresh_uc, get_register_uc
+)
 from src.application.use_cases.register_use_cases import RegisterUseCase
+from src.core.logging import get_logger
+
+log = get_logger(__name__)
 
 # Создаем роутер для аутентификации
 auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Неизменные атрибуты кук собираем один раз, а не через set_cookie на каждый ответ.
+# Secure - только для HTTPS в продакшене
+_COOKIE_ATTRS = "; Path=/; HttpOnly; Secure; SameSite=lax; Max-Age="
+_REFRESH_COOKIE_MAXAGE = 604_800  # 7 дней
+_ACCESS_SUFFIX = _COOKIE_ATTRS + "%d"
+_REFRESH_SUFFIX = f"{_COOKIE_ATTRS}{_REFRESH_COOKIE_MAXAGE}"
+_CLEAR_ACCESS = f"access_token={_COOKIE_ATTRS}0".encode("latin-1")
+_CLEAR_REFRESH = f"refresh_token={_COOKIE_ATTRS}0".encode("latin-1")
+
 
 @auth_router.post("/login", response_model=AuthResponse)
 async def login(
     request: LoginRequest,
-    response: Response,
-    user_repo=Depends(get_user_repo),
-    auth_services=Depends(get_auth_services),
-    event_publisher=Depends(get_event_publisher)
+    login_use_case: LoginUseCase = Depends(get_login_uc)
 ):
     """Вход в систему"""
-    login_use_case = LoginUseCase(
-        user_repo=user_repo,
-        auth_service=auth_services["auth_service"],
-        jwt_service=auth_services["jwt_service"],
-        event_publisher=event_publisher
-    )
-    
     result = await login_use_case.execute(request)
     if not result:
         raise HTTPException(
@@ -36,31 +45,24 @@ async def login(
             detail="Invalid email or password"
         )
     
-    # Устанавливаем HTTP-only куки
-    _set_auth_cookies(response, result.tokens)
-    
-    return result
+    return _auth_response(result)
 
 
 @auth_router.post("/refresh", response_model=AuthResponse)
 async def refresh_token(
     request: Request,
-    response: Response,
-    user_repo=Depends(get_user_repo),
-    auth_services=Depends(get_auth_services),
-    event_publisher=Depends(get_event_publisher)
+    refresh_use_case: RefreshTokenUseCase = Depends(get_refresh_uc)
 ):
     """Обновление токенов"""
-    # Пытаемся получить refresh токен из кук или из тела запроса
-    refresh_token = request.cookies.get("refresh_token")
-    
+    # Refresh токен берем из куки, клиенты без кук передают его
+    # в заголовке Authorization: Bearer - тело запроса не читаем
+    cookie_header = get_raw_header(request.scope, b"cookie")
+    refresh_token = get_cookie(cookie_header, b"refresh_token") if cookie_header else None
+
     if not refresh_token:
-        # Если нет в куках, пытаемся получить из тела запроса
-        try:
-            body = await request.json()
-            refresh_token = body.get("refresh_token")
-        except Exception:
-            pass
+        auth_header = get_raw_header(request.scope, b"authorization")
+        if auth_header and auth_header.startswith(b"Bearer "):
+            refresh_token = auth_header[7:].decode("latin-1") or None
     
     if not refresh_token:
         raise HTTPException(
@@ -68,12 +70,6 @@ async def refresh_token(
             detail="Refresh token is required"
         )
     
-    refresh_use_case = RefreshTokenUseCase(
-        user_repo=user_repo,
-        jwt_service=auth_services["jwt_service"],
-        event_publisher=event_publisher
-    )
-    
     result = await refresh_use_case.execute(refresh_token)
     if not result:
         raise HTTPException(
@@ -81,27 +77,14 @@ async def refresh_token(
             detail="Invalid or expired refresh token"
         )
     
-    # Устанавливаем HTTP-only куки
-    _set_auth_cookies(response, result.tokens)
-    
-    return result
+    return _auth_response(result)
 
 
 @auth_router.post("/register", response_model=AuthResponse)
 async def register(
     request: RegisterRequest,
-    response: Response,
-    user_repo=Depends(get_user_repo),
-    auth_services=Depends(get_auth_services),
-    event_publisher=Depends(get_event_publisher)
+    register_use_case: RegisterUseCase = Depends(get_register_uc)
 ):
-    register_use_case = RegisterUseCase(
-        user_repo=user_repo,
-        auth_service=auth_services["auth_service"],
-        jwt_service=auth_services["jwt_service"],
-        event_publisher=event_publisher
-    )
-
     result = await register_use_case.execute(request)
     if not result:
         raise HTTPException(
@@ -109,107 +92,56 @@ async def register(
             detail="User with this email already exists"
         )
 
-    _set_auth_cookies(response, result.tokens)
-
-    return result
+    return _auth_response(result)
 
 
 @auth_router.get("/me", response_model=UserResponse)
-async def get_current_user(
-    request: Request,
-    user_repo=Depends(get_user_repo),
-    jwt_service=Depends(get_jwt_service)
-):
-    access_token = request.cookies.get("access_token")
-
-    if not access_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-
-    try:
-        payload = jwt_service.verify_access_token(access_token)
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
-
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token payload"
-            )
-
-        user = await user_repo.get_by_id(user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="User account is deactivated"
-            )
-
-        return UserResponse(
-            id=str(user.id),
-            email=user.email,
-            name=user.name,
-            is_active=user.is_active,
-            created_at=user.created_at,
-            updated_at=user.updated_at
-        )
-
-    except HTTPException:
-        raise
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token verification failed"
-        )
+async def get_current_user(user: ActiveUserDep):
+    return UserResponse.model_construct(
+        id=str(user.id),
+        email=user.email,
+        name=user.name,
+        is_active=user.is_active,
+        created_at=user.created_at,
+        updated_at=user.updated_at
+    )
 
 
 @auth_router.post("/logout")
 async def logout(
     request: Request,
     response: Response,
-    user_repo=Depends(get_user_repo),
     jwt_service=Depends(get_jwt_service),
     event_publisher=Depends(get_event_publisher)
 ):
     user_id = None
     user_email = None
-    
-    try:
-        access_token = request.cookies.get("access_token")
-        if access_token:
-            payload = jwt_service.verify_access_token(access_token)
-            if payload:
-                user_id = payload.get("sub")
-                user_email = payload.get("email")
-    except Exception:
-        pass
 
-    # Публикуем событие выхода пользователя
+    # Logout публичный: куки чистим всегда, даже с истекшим токеном.
+    # Событие публикуем только для валидного токена - иначе его можно подделать
+    cookie_header = get_raw_header(request.scope, b"cookie")
+    access_token = get_cookie(cookie_header, b"access_token") if cookie_header else None
+    if not access_token:
+        auth_header = get_raw_header(request.scope, b"authorization")
+        if auth_header and auth_header.startswith(b"Bearer "):
+            access_token = auth_header[7:].decode("latin-1") or None
+
+    payload = jwt_service.verify_access_token(access_token) if access_token else None
+    if payload:
+        user_id = payload.get("sub")
+        user_email = payload.get("email")
+
+    # Публикуем событие выхода пользователя (в фоне)
     if event_publisher and user_id:
         try:
-            from src.application.dto import UserLoggedOutEvent
-            from datetime import datetime
             event = UserLoggedOutEvent(
                 user_id=user_id,
                 email=user_email or "",
-                timestamp=datetime.utcnow()
+                timestamp=datetime.now(timezone.utc)
             )
-            await event_publisher.publish(event)
+            event_publisher.publish_nowait(event)
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Failed to publish user_logged_out event: {e}")
+            log.error(f"Failed to publish user_logged_out event: {e}")
 
     _clear_auth_cookies(response)
 
@@ -220,40 +152,32 @@ async def logout(
 
 
 def _clear_auth_cookies(response: Response):
-    response.delete_cookie(
-        "access_token",
-        path="/",
-        secure=True,
-        httponly=True,
-        samesite="lax"
-    )
-    response.delete_cookie(
-        "refresh_token",
-        path="/",
-        secure=True,
-        httponly=True,
-        samesite="lax"
-    )
+    response.raw_headers.extend((
+        (b"set-cookie", _CLEAR_ACCESS),
+        (b"set-cookie", _CLEAR_REFRESH),
+    ))
+
+
+def _auth_response(result: AuthResponse) -> Response:
+    """JSON-ответ аутентификации с HTTP-only куками токенов"""
+    # Сериализуем сразу в pydantic-core; возврат готового Response
+    # избавляет FastAPI от повторной валидации по response_model,
+    # который остается только для схемы OpenAPI
+    response = Response(content=result.model_dump_json(), media_type="application/json")
+    _set_auth_cookies(response, result.tokens)
+    return response
 
 
 def _set_auth_cookies(response: Response, tokens: TokenResponse):
     """Установка HTTP-only кук для токенов"""
     # Access token cookie
-    response.set_cookie(
-        key="access_token",
-        value=tokens.access_token,
-        max_age=tokens.expires_in,
-        httponly=True,
-        secure=True,  # Только для HTTPS в продакшене
-        samesite="lax"
-    )
-    
+    response.raw_headers.append((
+        b"set-cookie",
+        f"access_token={tokens.access_token}{_ACCESS_SUFFIX % tokens.expires_in}".encode("latin-1"),
+    ))
+
     # Refresh token cookie (более длительный срок)
-    response.set_cookie(
-        key="refresh_token",
-        value=tokens.refresh_token,
-        max_age=7 * 24 * 60 * 60,  # 7 дней
-        httponly=True,
-        secure=True,  # Только для HTTPS в продакшене
-        samesite="lax"
-    )
+    response.raw_headers.append((
+        b"set-cookie",
+        f"refresh_token={tokens.refresh_token}{_REFRESH_SUFFIX}".encode("latin-1"),
+    ))
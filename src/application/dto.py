@@ -1,24 +1,45 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr
+from typing import Annotated, Optional
+from pydantic import AfterValidator, BaseModel, ConfigDict
 
+# Синтаксическая проверка email одним скомпилированным regex
+# вместо EmailStr (email-validator с idna на каждый запрос)
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+def _check_email(value: str) -> str:
+    # fullmatch: "$" в match пропустил бы завершающий перевод строки
+    if not _EMAIL_RE.fullmatch(value):
+        raise ValueError("value is not a valid email address")
+    # Домен регистронезависим - нормализуем, как это делал EmailStr
+    local, domain = value.rsplit("@", 1)
+    return f"{local}@{domain.lower()}"
+
+
+Email = Annotated[str, AfterValidator(_check_email)]
+
+
+class _ResponseModel(BaseModel):
+    """Базовый класс ответов: неизменяемы после сборки через model_construct"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
 
 
 class RegisterRequest(BaseModel):
-    email: EmailStr
+    email: Email
     password: str
     name: str
 
 
 class LoginRequest(BaseModel):
     """Запрос на вход в систему"""
-    email: EmailStr
+    email: Email
     password: str
 
 
-class TokenResponse(BaseModel):
+class TokenResponse(_ResponseModel):
     """Ответ с токенами"""
     access_token: str
     refresh_token: str
@@ -31,7 +52,7 @@ class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
 
-class UserResponse(BaseModel):
+class UserResponse(_ResponseModel):
     """Информация о пользователе"""
     id: str
     email: str
@@ -41,7 +62,7 @@ class UserResponse(BaseModel):
     updated_at: datetime
 
 
-class AuthResponse(BaseModel):
+class AuthResponse(_ResponseModel):
     """Полный ответ аутентификации"""
     user: UserResponse
     tokens: TokenResponse
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+import logging
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
 
 from src.application.dto import (
     LoginRequest, AuthResponse, UserResponse, TokenResponse,
@@ -9,7 +10,11 @@ from src.application.dto import (
 )
 from src.domain.repositories import UserRepository
 from src.domain.services import AuthService, JWTService
-from src.infrastructure.mq.publisher import EventPublisher
+
+if TYPE_CHECKING:
+    from src.infrastructure.mq.publisher import EventPublisher
+
+logger = logging.getLogger(__name__)
 
 
 class LoginUseCase:
@@ -31,11 +36,12 @@ class LoginUseCase:
         """Выполнить вход в систему"""
         # Получаем пользователя по email
         user = await self.user_repo.get_by_email(request.email)
-        if not user:
-            return None
         
-        # Проверяем пароль
-        if not self.auth_service.authenticate_user(user, request.password):
+        # Проверяем пароль (bcrypt считается в пуле потоков PasswordService).
+        # Отсутствующего пользователя тоже передаем: authenticate_user
+        # выровняет время ответа проверкой хеша-заглушки
+        is_authenticated = await self.auth_service.authenticate_user(user, request.password)
+        if not is_authenticated or user is None:
             return None
         
         # Создаем токены
@@ -47,17 +53,16 @@ class LoginUseCase:
                 event = UserLoggedInEvent(
                     user_id=user.id,
                     email=user.email,
-                    timestamp=datetime.utcnow()
+                    timestamp=datetime.now(timezone.utc)
                 )
-                await self.event_publisher.publish(event)
+                self.event_publisher.publish_nowait(event)
             except Exception as e:
                 # Логируем ошибку, но не прерываем процесс входа
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.error(f"Failed to publish user_logged_in event: {e}")
         
-        return AuthResponse(
-            user=UserResponse(
+        # Данные внутренние и уже проверены - собираем ответ без валидации pydantic
+        return AuthResponse.model_construct(
+            user=UserResponse.model_construct(
                 id=user.id,
                 email=user.email,
                 name=user.name,
@@ -65,7 +70,7 @@ class LoginUseCase:
                 created_at=user.created_at,
                 updated_at=user.updated_at
             ),
-            tokens=TokenResponse(
+            tokens=TokenResponse.model_construct(
                 access_token=auth_result.tokens.access_token,
                 refresh_token=auth_result.tokens.refresh_token,
                 token_type=auth_result.tokens.token_type,
@@ -112,17 +117,15 @@ class RefreshTokenUseCase:
                 event = TokenRefreshedEvent(
                     user_id=user.id,
                     email=user.email,
-                    timestamp=datetime.utcnow()
+                    timestamp=datetime.now(timezone.utc)
                 )
-                await self.event_publisher.publish(event)
+                self.event_publisher.publish_nowait(event)
             except Exception as e:
                 # Логируем ошибку, но не прерываем процесс обновления токена
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.error(f"Failed to publish token_refreshed event: {e}")
         
-        return AuthResponse(
-            user=UserResponse(
+        return AuthResponse.model_construct(
+            user=UserResponse.model_construct(
                 id=user.id,
                 email=user.email,
                 name=user.name,
@@ -130,7 +133,7 @@ class RefreshTokenUseCase:
                 created_at=user.created_at,
                 updated_at=user.updated_at
             ),
-            tokens=TokenResponse(
+            tokens=TokenResponse.model_construct(
                 access_token=tokens.access_token,
                 refresh_token=tokens.refresh_token,
                 token_type=tokens.token_type,
@@ -1,6 +1,10 @@
+from __future__ import annotations
+
+import asyncio
+import logging
 import uuid
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
 from src.application.dto import (
     RegisterRequest, AuthResponse, TokenResponse, UserResponse,
     UserCreatedEvent
@@ -8,7 +12,11 @@ from src.application.dto import (
 from src.domain.entities import User
 from src.domain.repositories import UserRepository
 from src.domain.services import AuthService, JWTService
-from src.infrastructure.mq.publisher import EventPublisher
+
+if TYPE_CHECKING:
+    from src.infrastructure.mq.publisher import EventPublisher
+
+logger = logging.getLogger(__name__)
 
 
 class RegisterUseCase:
@@ -25,14 +33,15 @@ class RegisterUseCase:
         self.event_publisher = event_publisher
 
     async def execute(self, request: RegisterRequest) -> Optional[AuthResponse]:
-        # Проверяем, существует ли пользователь с таким email
-        existing_user = await self.user_repo.get_by_email(request.email)
-        if existing_user:
+        # Проверка email (I/O) и bcrypt (CPU в пуле PasswordService) независимы -
+        # выполняем их параллельно, латентность равна большей из двух
+        email_taken, hashed_password = await asyncio.gather(
+            self.user_repo.exists_by_email(request.email),
+            self.auth_service.get_password_hash(request.password),
+        )
+        if email_taken:
             return None
 
-        # Хешируем пароль
-        hashed_password = self.auth_service.get_password_hash(request.password)
-
         # Создаем пользователя
         user = User(
             id=str(uuid.uuid4()),
@@ -52,22 +61,20 @@ class RegisterUseCase:
                     user_id=str(saved_user.id),
                     email=saved_user.email,
                     name=saved_user.name,
-                    created_at=saved_user.created_at or datetime.utcnow()
+                    created_at=saved_user.created_at or datetime.now(timezone.utc)
                 )
-                await self.event_publisher.publish(event)
+                self.event_publisher.publish_nowait(event)
             except Exception as e:
                 # Логируем ошибку, но не прерываем процесс регистрации
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.error(f"Failed to publish user_created event: {e}")
 
-        # Генерируем токены - передаем объект пользователя
-        access_token = self.jwt_service.create_access_token(saved_user)
-        refresh_token = self.jwt_service.create_refresh_token(saved_user)
+        # Генерируем пару токенов - передаем объект пользователя
+        tokens = self.jwt_service.create_token_pair(saved_user)
 
         # Создаем ответ
-        return AuthResponse(
-            user=UserResponse(
+        # Данные внутренние и уже проверены - собираем ответ без валидации pydantic
+        return AuthResponse.model_construct(
+            user=UserResponse.model_construct(
                 id=str(saved_user.id),
                 email=saved_user.email,
                 name=saved_user.name,
@@ -75,9 +82,10 @@ class RegisterUseCase:
                 created_at=saved_user.created_at,
                 updated_at=saved_user.updated_at
             ),
-            tokens=TokenResponse(
-                access_token=access_token,
-                refresh_token=refresh_token,
-                expires_in=self.jwt_service.access_token_expire_minutes * 60  # в секундах
+            tokens=TokenResponse.model_construct(
+                access_token=tokens.access_token,
+                refresh_token=tokens.refresh_token,
+                token_type=tokens.token_type,
+                expires_in=tokens.expires_in
             )
         )
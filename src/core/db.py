@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Optional, AsyncIterator
 
@@ -16,19 +17,57 @@ _engine: Optional[AsyncEngine] = None
 _session_factory: Optional[async_sessionmaker[AsyncSession]] = None
 
 
-async def init_engine(url: str | SAURL, echo: bool = False) -> AsyncEngine:
+async def init_engine(
+    url: str | SAURL,
+    echo: bool = False,
+    *,
+    pool_size: int = 20,
+    max_overflow: int = 40,
+    pool_timeout: int = 10,
+    pool_recycle: int = 1800,
+) -> AsyncEngine:
 
     global _engine
 
     if _engine is not None:
         return _engine
-    engine = create_async_engine(url, echo=echo, pool_pre_ping=True)
+
+    pool_kwargs: dict = {}
+    if not _is_sqlite(url):
+        # SQLite использует собственные пулы без этих параметров
+        pool_kwargs = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle,
+        }
+    engine = create_async_engine(url, echo=echo, pool_pre_ping=True, **pool_kwargs)
     _install_sqlite_pragmas_if_needed(engine)
 
     _engine = engine
     return engine
 
 
+async def warmup_pool(engine: AsyncEngine, connections: int, pool_size: int) -> None:
+    """Заранее открыть соединения, чтобы первые запросы не ждали connect"""
+    if connections <= 0 or _is_sqlite(engine.url):
+        return
+    # Держим все соединения одновременно, иначе пул отдаст одно и то же;
+    # больше pool_size открывать незачем - лишние закроются как overflow
+    connections = min(connections, pool_size)
+    conns = await asyncio.gather(
+        *(engine.connect() for _ in range(connections)), return_exceptions=True
+    )
+    opened = [c for c in conns if not isinstance(c, BaseException)]
+    try:
+        await asyncio.gather(*(c.execute(text("SELECT 1")) for c in opened))
+    finally:
+        # Возвращаем соединения в пул - там они и остаются открытыми
+        await asyncio.gather(*(c.close() for c in opened), return_exceptions=True)
+    if len(opened) < len(conns):
+        raise next(c for c in conns if isinstance(c, BaseException))
+
+
 def init_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
 
     global _session_factory
@@ -90,6 +129,10 @@ async def session_scope(
             raise
 
 
+def _is_sqlite(url: str | SAURL) -> bool:
+    return str(url).startswith("sqlite")
+
+
 def _install_sqlite_pragmas_if_needed(engine: AsyncEngine) -> None:
     if not str(engine.url).startswith("sqlite+"):
         return
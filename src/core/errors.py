@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from starlette import status
 
 from src.core.logging import get_logger
 log = get_logger(__name__)
 
 
+class ProblemJSONResponse(ORJSONResponse):
+    """RFC 7807 problem+json, сериализуемый через orjson"""
+    media_type = "application/problem+json"
+
 
 @dataclass(slots=True)
 class AppError(Exception):
@@ -21,15 +25,20 @@ class AppError(Exception):
     status_code: int = status.HTTP_400_BAD_REQUEST
     instance: str | None = None
     extra: dict[str, Any] | None = None
+    _base_problem: dict[str, Any] = field(init=False, repr=False, compare=False)
 
-    def to_problem(self, request: Request) -> dict[str, Any]:
-        problem = {
+    def __post_init__(self) -> None:
+        # Неизменная часть problem-документа собирается один раз
+        self._base_problem = {
             "type": f"/problems/{self.type}",
             "title": self.title,
             "status": self.status_code,
             "detail": self.detail,
-            "instance": self.instance or str(request.url),
         }
+
+    def to_problem(self, instance_url: str) -> dict[str, Any]:
+        """instance_url - уже приведенный к строке URL запроса"""
+        problem = {**self._base_problem, "instance": self.instance or instance_url}
         if self.extra:
             problem.update(self.extra)
         return problem
@@ -38,34 +47,37 @@ class AppError(Exception):
 def register_exception_handlers(app: FastAPI) -> None:
 
     @app.exception_handler(AppError)
-    async def app_error_handler(request: Request, exc: AppError) -> JSONResponse:
+    async def app_error_handler(request: Request, exc: AppError) -> ProblemJSONResponse:
 
+        # URL собирается из компонентов при каждом str() - делаем это один раз
+        url_str = str(request.url)
         log.error(
             f"AppError [{exc.type}] {exc.title}",
-            extra={"status_code": exc.status_code, "url": str(request.url), "detail": exc.detail},
-            exc_info=True, 
+            extra={"status_code": exc.status_code, "url": url_str, "detail": exc.detail},
+            # Traceback нужен только для ошибок сервера: 4xx - ожидаемые
+            # ошибки клиента, их рендеринг лишь замедляет ответ
+            exc_info=exc.status_code >= 500,
         )
 
-        return JSONResponse(
+        return ProblemJSONResponse(
             status_code=exc.status_code,
-            content=exc.to_problem(request),
-            media_type="application/problem+json",
+            content=exc.to_problem(url_str),
         )
 
     @app.exception_handler(ValueError)
-    async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse:
-        log.warning(f"Validation error at {request.url}: {exc}")
+    async def value_error_handler(request: Request, exc: ValueError) -> ProblemJSONResponse:
+        url_str = str(request.url)
+        log.warning(f"Validation error at {url_str}: {exc}")
 
         problem = {
             "type": "/problems/validation_error",
             "title": "Validation error",
             "status": status.HTTP_400_BAD_REQUEST,
             "detail": str(exc),
-            "instance": str(request.url),
+            "instance": url_str,
         }
 
-        return JSONResponse(
+        return ProblemJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content=problem,
-            media_type="application/problem+json",
         )
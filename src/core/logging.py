@@ -1,17 +1,38 @@
 from __future__ import annotations
 
+import atexit
+import copy
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
-from rich.console import Console
-from rich.logging import RichHandler
 
 _INITIALIZED = False
-_console = Console()
+_listener: QueueListener | None = None
 
 
-def init_logging(level: str = "INFO") -> None:
+class _RichQueueHandler(QueueHandler):
+    """QueueHandler, сохраняющий exc_info для RichHandler"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Аргументы подставляем в вызывающем потоке, а traceback не
+        # форматируем: его отрисует RichHandler в потоке listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def init_logging(level: str = "INFO", rich_tracebacks: bool = True) -> None:
 
     global _INITIALIZED
     if _INITIALIZED:
@@ -19,11 +40,25 @@ def init_logging(level: str = "INFO") -> None:
 
     level_num = getattr(logging, level.upper(), logging.INFO)
 
+    # rich тяжелый при импорте - загружаем его только при настройке логирования,
+    # а не в каждом процессе, который импортирует get_logger
+    from rich.console import Console
+    from rich.logging import RichHandler
+
+    # Rich рендерит записи в отдельном потоке: в вызывающем коде под
+    # блокировкой logging остается только put в очередь
+    global _listener
+    # rich_tracebacks=False в prod: обычный traceback дешевле подсвеченного
+    rich_handler = RichHandler(console=Console(), markup=True, rich_tracebacks=rich_tracebacks)
+    rich_handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, rich_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_stop_listener)
+
     logging.basicConfig(
         level=level_num,
-        format="%(message)s",  # RichHandler renders time/level/name
-        datefmt="[%X]",
-        handlers=[RichHandler(console=_console, markup=True, rich_tracebacks=True)],
+        handlers=[_RichQueueHandler(log_queue)],
     )
 
     for noisy in ("uvicorn.access", "asyncio", "aiosqlite"):
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Optional
 
 
-@dataclass
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# Сущности неизменяемы (frozen) и без __dict__ (slots): меньше памяти
+# на экземпляр, и кешированный пользователь можно отдавать без копии
+
+@dataclass(slots=True, frozen=True)
 class User:
     """Пользователь для аутентификации"""
     id: str
@@ -13,17 +20,11 @@ class User:
     name: str
     password_hash: str
     is_active: bool = True
-    created_at: datetime = None
-    updated_at: datetime = None
-
-    def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.utcnow()
-        if self.updated_at is None:
-            self.updated_at = datetime.utcnow()
+    created_at: datetime = field(default_factory=_utcnow)
+    updated_at: datetime = field(default_factory=_utcnow)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TokenPair:
     """Пара токенов (access + refresh)"""
     access_token: str
@@ -32,7 +33,7 @@ class TokenPair:
     expires_in: int = 1800  # 30 минут
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AuthResult:
     """Результат аутентификации"""
     user: User
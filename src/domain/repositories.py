@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional, Protocol
+from typing import Any, Optional, Protocol
 from src.domain.entities import User
 
 
@@ -15,6 +15,10 @@ class UserRepository(Protocol):
         """Получить пользователя по email"""
         ...
     
+    async def exists_by_email(self, email: str) -> bool:
+        """Проверить, занят ли email"""
+        ...
+    
     async def create(self, user: User) -> User:
         """Создать нового пользователя"""
         ...
@@ -23,6 +27,10 @@ class UserRepository(Protocol):
         """Обновить пользователя"""
         ...
     
+    async def update_fields(self, user_id: str, **changes: Any) -> bool:
+        """Обновить только переданные поля пользователя"""
+        ...
+    
     async def delete(self, user_id: str) -> bool:
         """Удалить пользователя"""
         ...
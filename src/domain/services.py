@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import functools
 import hashlib
-from datetime import datetime, timedelta
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import Optional
 
 import bcrypt
-from jose import JWTError, jwt
+import orjson
 
 from src.core.config import Settings
 from src.domain.entities import User, TokenPair, AuthResult
@@ -14,100 +19,188 @@ from src.domain.entities import User, TokenPair, AuthResult
 
 class PasswordService:
     """Сервис для работы с паролями"""
+
+    def __init__(self, rounds: int = 12, max_workers: Optional[int] = None):
+        """
+        rounds - cost bcrypt: каждая единица удваивает время хеширования.
+        Подбирается на целевом железе: замерить bcrypt.hashpw с gensalt(rounds)
+        и взять наибольшее значение, укладывающееся в бюджет латентности
+        логина (ориентир - 100-250 мс). Старые хеши хранят свой cost
+        и продолжают проверяться при изменении настройки
+        """
+        self.rounds = rounds
+        # Хеш-заглушка для попыток входа без существующего/активного
+        # пользователя: ответ занимает столько же, сколько настоящая проверка
+        self._dummy_hash = bcrypt.hashpw(b"dummy-password", bcrypt.gensalt(rounds=rounds))
+        # bcrypt грузит CPU и отпускает GIL - считаем его в собственном пуле,
+        # не блокируя event loop и не занимая общий пул потоков
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count(), thread_name_prefix="bcrypt"
+        )
+
+    def close(self) -> None:
+        """Остановить пул потоков bcrypt"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
     
     def _prepare_password(self, password: str) -> bytes:
         """Подготовка пароля для bcrypt (ограничение 72 байта)"""
         password_bytes = password.encode('utf-8')
-        # Если пароль длиннее 72 байт, предварительно хешируем его SHA256
+        # Если пароль длиннее 72 байт, предварительно хешируем его SHA256.
+        # base64 оставляем ради совместимости: смена представления
+        # сломала бы проверку уже сохраненных хешей.
+        # Base64 от 32 байт - всегда 44 байта, что < 72
         if len(password_bytes) > 72:
-            # Используем base64 для компактного представления (44 символа = 44 байта)
-            hash_bytes = hashlib.sha256(password_bytes).digest()
-            prepared = base64.b64encode(hash_bytes)
-            # Base64 строка из 32 байт всегда будет 44 байта, что < 72
-            return prepared
+            return base64.b64encode(hashlib.sha256(password_bytes).digest())
         return password_bytes
     
-    def hash_password(self, password: str) -> str:
+    async def hash_password(self, password: str) -> str:
         """Хеширование пароля"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._hash_password, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверка пароля"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, self._verify_password, plain_password, hashed_password
+        )
+
+    async def dummy_verify(self, plain_password: str) -> None:
+        """Проверка против хеша-заглушки; результат всегда отбрасывается"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._pool, self._dummy_verify, plain_password)
+
+    def _dummy_verify(self, plain_password: str) -> None:
+        bcrypt.checkpw(self._prepare_password(plain_password), self._dummy_hash)
+
+    def _hash_password(self, password: str) -> str:
         prepared_password = self._prepare_password(password)
-        # Обрезаем до 72 байт на всякий случай
-        if len(prepared_password) > 72:
-            prepared_password = prepared_password[:72]
         # Генерируем соль и хешируем пароль
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=self.rounds)
         hashed = bcrypt.hashpw(prepared_password, salt)
         return hashed.decode('utf-8')
     
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Проверка пароля"""
+    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
         prepared_password = self._prepare_password(plain_password)
-        # Обрезаем до 72 байт на всякий случай
-        if len(prepared_password) > 72:
-            prepared_password = prepared_password[:72]
         # Проверяем пароль
         hashed_bytes = hashed_password.encode('utf-8')
         return bcrypt.checkpw(prepared_password, hashed_bytes)
 
 
+@functools.cache
+def _jwt():
+    """Ленивый импорт PyJWT"""
+    # При импорте PyJWT тянет cryptography, а HS* токены подписываются
+    # без него - загружаем библиотеку только при первой проверке
+    import jwt
+
+    return jwt
+
+
+@functools.cache
+def _jwt_decoder():
+    """Один декодер на процесс - без создания объектов PyJWT/PyJWS на каждую проверку"""
+    jwt = _jwt()
+
+    class _OrjsonPyJWT(jwt.PyJWT):
+        """PyJWT с разбором payload через orjson"""
+
+        def _decode_payload(self, decoded: dict) -> dict:
+            try:
+                payload = orjson.loads(decoded["payload"])
+            except orjson.JSONDecodeError as e:
+                raise jwt.DecodeError(f"Invalid payload string: {e}") from e
+            if not isinstance(payload, dict):
+                raise jwt.DecodeError("Invalid payload string: must be a json object")
+            return payload
+
+    return _OrjsonPyJWT()
+
+
+# HMAC-алгоритмы, которые подписываем сами, без jwt.encode
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
 class JWTService:
     """Сервис для работы с JWT токенами"""
     
     def __init__(self, settings: Settings):
         self.secret_key = settings.jwt_secret_key
         self.algorithm = settings.jwt_algorithm
+        # Ключ и список алгоритмов готовим один раз
+        self._key = self.secret_key.encode()
+        self._algorithms = [self.algorithm]
         self.access_token_expire_minutes = settings.jwt_access_token_expire_minutes
         self.refresh_token_expire_days = settings.jwt_refresh_token_expire_days
+        # Сроки жизни не меняются - считаем их один раз (в секундах)
+        self.access_expires_in = self.access_token_expire_minutes * 60
+        self._refresh_ttl = self.refresh_token_expire_days * 24 * 60 * 60
+        # Заголовок JWT одинаков для всех токенов - кодируем его один раз
+        self._hmac_digest = _HMAC_DIGESTS.get(self.algorithm)
+        self._header_b64 = _b64url(orjson.dumps({"alg": self.algorithm, "typ": "JWT"}))
+
+    def _encode(self, payload: dict) -> str:
+        """Подпись токена: для HS* - готовый заголовок, orjson и hmac"""
+        if self._hmac_digest is None:
+            return _jwt().encode(payload, self._key, algorithm=self.algorithm)
+        signing_input = self._header_b64 + b"." + _b64url(orjson.dumps(payload))
+        signature = hmac.new(self._key, signing_input, self._hmac_digest).digest()
+        return (signing_input + b"." + _b64url(signature)).decode("ascii")
     
-    def create_access_token(self, user: User) -> str:
+    def create_access_token(self, user: User, now: Optional[datetime] = None) -> str:
         """Создание access токена"""
-        expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
+        expire = int((now or datetime.now(timezone.utc)).timestamp()) + self.access_expires_in
         to_encode = {
             "sub": user.id,
             "email": user.email,
             "exp": expire,
             "type": "access"
         }
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        return self._encode(to_encode)
     
-    def create_refresh_token(self, user: User) -> str:
+    def create_refresh_token(self, user: User, now: Optional[datetime] = None) -> str:
         """Создание refresh токена"""
-        expire = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
+        expire = int((now or datetime.now(timezone.utc)).timestamp()) + self._refresh_ttl
         to_encode = {
             "sub": user.id,
             "exp": expire,
             "type": "refresh"
         }
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        return self._encode(to_encode)
     
+    def _decode(self, token: str) -> Optional[dict]:
+        """Проверка подписи и срока действия токена"""
+        try:
+            return _jwt_decoder().decode(token, self._key, algorithms=self._algorithms)
+        except _jwt().PyJWTError:
+            return None
+
     def verify_access_token(self, token: str) -> Optional[dict]:
         """Проверка access токена"""
-        try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            if payload.get("type") != "access":
-                return None
-            return payload
-        except JWTError:
+        payload = self._decode(token)
+        if not payload or payload.get("type") != "access":
             return None
+        return payload
     
     def verify_refresh_token(self, token: str) -> Optional[dict]:
         """Проверка refresh токена"""
-        try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            if payload.get("type") != "refresh":
-                return None
-            return payload
-        except JWTError:
+        payload = self._decode(token)
+        if not payload or payload.get("type") != "refresh":
             return None
-    
+        return payload
+
     def create_token_pair(self, user: User) -> TokenPair:
         """Создание пары токенов"""
-        access_token = self.create_access_token(user)
-        refresh_token = self.create_refresh_token(user)
-        
+        # Одна отметка времени на оба токена
+        now = datetime.now(timezone.utc)
         return TokenPair(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=self.access_token_expire_minutes * 60
+            access_token=self.create_access_token(user, now),
+            refresh_token=self.create_refresh_token(user, now),
+            expires_in=self.access_expires_in
         )
 
 
@@ -118,25 +211,21 @@ class AuthService:
         self.password_service = password_service
         self.jwt_service = jwt_service
     
-    def authenticate_user(self, user: User, password: str) -> bool:
+    async def authenticate_user(self, user: Optional[User], password: str) -> bool:
         """Аутентификация пользователя по паролю"""
-        if not user or not user.is_active:
+        # Инвариант: настоящий bcrypt - только для существующего активного
+        # пользователя; иначе проверка заглушки, чтобы время ответа
+        # не выдавало, зарегистрирован ли email
+        if user is None or not user.is_active:
+            await self.password_service.dummy_verify(password)
             return False
-        return self.password_service.verify_password(password, user.password_hash)
+        return await self.password_service.verify_password(password, user.password_hash)
     
     def create_auth_result(self, user: User) -> AuthResult:
         """Создание результата аутентификации"""
         tokens = self.jwt_service.create_token_pair(user)
         return AuthResult(user=user, tokens=tokens)
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Проверка пароля"""
-        return self.password_service.verify_password(plain_password, hashed_password)
-
-    def get_password_hash(self, password: str) -> str:
+    async def get_password_hash(self, password: str) -> str:
         """Хеширование пароля"""
-        return self.password_service.hash_password(password)
-
-    def hash_password(self, password: str) -> str:
-        """Хеширование пароля (алиас)"""
-        return self.get_password_hash(password)
\ No newline at end of file
+        return await self.password_service.hash_password(password)
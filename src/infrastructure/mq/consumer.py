@@ -1,48 +1,93 @@
-import json
+import asyncio
 import logging
 import aio_pika
-from aio_pika.abc import AbstractRobustConnection
+import orjson
+from aio_pika.abc import AbstractIncomingMessage, AbstractRobustConnection
 from typing import Dict, Callable, Any
 from src.core.config import Settings, load_settings
 
 logger = logging.getLogger(__name__)
 
+# Одно AMQP-соединение на процесс для всех consumer; у каждого свой канал
+_connection: AbstractRobustConnection | None = None
+_connection_lock = asyncio.Lock()
+
+
+async def get_connection(url: str) -> AbstractRobustConnection:
+    """Общее robust-соединение с RabbitMQ (создается при первом вызове)"""
+    global _connection
+    if _connection is None or _connection.is_closed:
+        async with _connection_lock:
+            if _connection is None or _connection.is_closed:
+                _connection = await aio_pika.connect_robust(url)
+    return _connection
+
+
+async def close_connection() -> None:
+    """Закрыть общее соединение consumer"""
+    global _connection
+    if _connection is not None:
+        await _connection.close()
+        _connection = None
+        logger.info("Event consumer connection closed")
+
+
+_PREFETCH_COUNT = 10
+# Неполную пачку ждем не дольше 50 мс
+_BATCH_SIZE = 10
+_BATCH_TIMEOUT_SECONDS = 0.05
+
 
 class EventConsumer:
     def __init__(self, settings: Settings | None = None):
         self.settings = settings or load_settings()
-        self.connection: AbstractRobustConnection = None
-        self.channel: aio_pika.abc.AbstractChannel = None
+        self.connection: AbstractRobustConnection | None = None
+        self.channel: aio_pika.abc.AbstractChannel | None = None
         self.handlers: Dict[str, Callable] = {}
+        # Типы событий, обработчики которых принимают список событий
+        self._batch_handlers: set[str] = set()
+        # Обработчики работают параллельно, но не больше event_concurrency сразу
+        self._sem = asyncio.Semaphore(self.settings.event_concurrency)
+        self._tasks: set[asyncio.Task] = set()
 
-    async def connect(self):
+    async def connect(self) -> aio_pika.abc.AbstractChannel:
         try:
-            self.connection = await aio_pika.connect_robust(self.settings.rabbitmq_url)
-            self.channel = await self.connection.channel()
+            self.connection = await get_connection(self.settings.rabbitmq_url)
+            channel = await self.connection.channel()
 
-            await self.channel.set_qos(prefetch_count=10)
+            # Брокер должен отдавать хотя бы столько сообщений, сколько
+            # обработчиков может работать одновременно
+            await channel.set_qos(
+                prefetch_count=max(_PREFETCH_COUNT, self.settings.event_concurrency)
+            )
+            self.channel = channel
 
             logger.info("Event consumer connected to RabbitMQ successfully")
+            return channel
 
         except Exception as e:
             logger.error(f"Failed to connect to RabbitMQ: {e}")
             raise
 
-    def register_handler(self, event_type: str, handler: Callable[[Dict[str, Any]], None]):
+    def register_handler(self, event_type: str, handler: Callable[..., Any], batch: bool = False):
+        """batch=True - handler получает список событий пачки, а не одно событие"""
         self.handlers[event_type] = handler
+        if batch:
+            self._batch_handlers.add(event_type)
+        else:
+            self._batch_handlers.discard(event_type)
         logger.debug(f"Handler registered for event type: {event_type}")
 
     async def start_consuming(self, queue_name: str = "auth_events"):
-        if not self.channel:
-            await self.connect()
+        channel = self.channel or await self.connect()
 
-        exchange = await self.channel.declare_exchange(
+        exchange = await channel.declare_exchange(
             "blog_events",
             aio_pika.ExchangeType.TOPIC,
             durable=True
         )
 
-        queue = await self.channel.declare_queue(
+        queue = await channel.declare_queue(
             queue_name,
             durable=True,
             arguments={
@@ -60,30 +105,113 @@ class EventConsumer:
 
         logger.info(f"Started consuming from queue: {queue_name}")
 
-        async with queue.iterator() as queue_iter:
-            async for message in queue_iter:
-                async with message.process():
+        # Сообщения копим в локальной очереди и обрабатываем пачками
+        # с ручным ack, а не по одному внутри message.process()
+        inbox: asyncio.Queue[AbstractIncomingMessage] = asyncio.Queue()
+        consumer_tag = await queue.consume(inbox.put, no_ack=False)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                batch = [await inbox.get()]
+                # Один срок на всю пачку от первого сообщения, а не 50 мс
+                # заново после каждого
+                deadline = loop.time() + _BATCH_TIMEOUT_SECONDS
+                while len(batch) < _BATCH_SIZE:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
                     try:
-                        event_data = json.loads(message.body.decode())
-                        routing_key = message.routing_key or ""
-                        
-                        # Определяем тип события по routing_key или по event_type в теле сообщения
-                        if routing_key.startswith("auth."):
-                            event_type = event_data.get("event_type")
-                        else:
-                            event_type = event_data.get("event_type")
-
-                        if event_type and event_type in self.handlers:
-                            await self.handlers[event_type](event_data)
-                            logger.debug(f"Event processed: {event_type} (routing_key: {routing_key})")
-                        else:
-                            logger.warning(f"No handler for event type: {event_type} (routing_key: {routing_key})")
-
-                    except Exception as e:
-                        logger.error(f"Error processing message: {e}")
-                        # Message will be rejected and go to DLQ
+                        batch.append(await asyncio.wait_for(inbox.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                # Пачку обрабатываем в фоне: медленные обработчики не задерживают
+                # прием следующих сообщений, число неподтвержденных ограничено prefetch
+                task = asyncio.create_task(self._process_batch(batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            await queue.cancel(consumer_tag)
+
+    async def _process_batch(self, messages: list[AbstractIncomingMessage]) -> None:
+        """Разбор пачки и обработка событий, сгруппированных по типу"""
+        groups: Dict[str, list[tuple[AbstractIncomingMessage, Dict[str, Any]]]] = {}
+        for message in messages:
+            try:
+                # orjson разбирает bytes напрямую, без промежуточной строки
+                event_data = orjson.loads(message.body)
+            except orjson.JSONDecodeError as e:
+                logger.error(f"Error decoding message: {e}")
+                # Битое сообщение уходит в DLQ
+                await message.reject(requeue=False)
+                continue
+            if not isinstance(event_data, dict):
+                logger.error("Error decoding message: event must be a JSON object")
+                await message.reject(requeue=False)
+                continue
+
+            event_type = event_data.get("event_type")
+            if event_type and event_type in self.handlers:
+                groups.setdefault(event_type, []).append((message, event_data))
+            else:
+                logger.warning(
+                    f"No handler for event type: {event_type} "
+                    f"(routing_key: {message.routing_key})"
+                )
+                await message.ack()
+
+        await asyncio.gather(
+            *(self._dispatch(event_type, items) for event_type, items in groups.items())
+        )
+
+    async def _dispatch(
+        self, event_type: str, items: list[tuple[AbstractIncomingMessage, Dict[str, Any]]]
+    ) -> None:
+        handler = self.handlers[event_type]
+
+        if event_type in self._batch_handlers:
+            try:
+                async with self._sem:
+                    await handler([event_data for _, event_data in items])
+            except Exception as e:
+                logger.error(f"Error processing {event_type} batch: {e}")
+                for message, _ in items:
+                    await message.reject(requeue=False)
+                return
+            for message, _ in items:
+                await message.ack()
+            logger.debug(f"Event batch processed: {event_type} x{len(items)}")
+            return
+
+        # Обработчик без поддержки пачек - события независимы, обрабатываем параллельно
+        await asyncio.gather(
+            *(self._handle_one(handler, message, event_data) for message, event_data in items)
+        )
+
+    async def _handle_one(
+        self,
+        handler: Callable[..., Any],
+        message: AbstractIncomingMessage,
+        event_data: Dict[str, Any],
+    ) -> None:
+        try:
+            async with self._sem:
+                await handler(event_data)
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+            # Message will be rejected and go to DLQ
+            await message.reject(requeue=False)
+            return
+        await message.ack()
+        logger.debug(
+            f"Event processed: {event_data.get('event_type')} (routing_key: {message.routing_key})"
+        )
 
     async def close(self):
-        if self.connection:
-            await self.connection.close()
-            logger.info("Event consumer connection closed")
+        # Дожидаемся уже начатой обработки, чтобы успеть отправить ack
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Соединение общее - закрываем только свой канал
+        if self.channel:
+            await self.channel.close()
+            self.channel = None
+            logger.info("Event consumer channel closed")
@@ -1,4 +1,4 @@
-import json
+import asyncio
 import logging
 import aio_pika
 from aio_pika.abc import AbstractRobustConnection
@@ -6,13 +6,21 @@ from src.core.config import Settings, load_settings
 
 logger = logging.getLogger(__name__)
 
+# Очередь фоновых публикаций ограничена: при недоступном брокере
+# события отбрасываются, а не копятся в памяти
+_QUEUE_MAXSIZE = 10_000
+_BATCH_SIZE = 64
+_CLOSE_TIMEOUT_SECONDS = 5
+
 
 class EventPublisher:
     def __init__(self, settings: Settings | None = None):
         self.settings = settings or load_settings()
-        self.connection: AbstractRobustConnection = None
-        self.channel: aio_pika.abc.AbstractChannel = None
-        self.exchange: aio_pika.abc.AbstractExchange = None
+        self.connection: AbstractRobustConnection | None = None
+        self.channel: aio_pika.abc.AbstractChannel | None = None
+        self.exchange: aio_pika.abc.AbstractExchange | None = None
+        self._queue: asyncio.Queue | None = None
+        self._flush_task: asyncio.Task | None = None
 
     async def connect(self):
         try:
@@ -25,6 +33,11 @@ class EventPublisher:
                 durable=True
             )
 
+            # Одна фоновая задача отправляет накопленные события пачками
+            queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_MAXSIZE)
+            self._queue = queue
+            self._flush_task = asyncio.create_task(self._flush_loop(queue))
+
             logger.info("Event publisher connected to RabbitMQ successfully")
 
         except Exception as e:
@@ -37,9 +50,8 @@ class EventPublisher:
             return
 
         try:
-            message_body = json.dumps(event.dict()).encode()
             message = aio_pika.Message(
-                body=message_body,
+                body=event.model_dump_json().encode(),
                 content_type="application/json",
                 delivery_mode=aio_pika.DeliveryMode.PERSISTENT
             )
@@ -53,7 +65,53 @@ class EventPublisher:
             logger.error(f"Failed to publish event: {e}")
             raise
 
+    def publish_nowait(self, event) -> None:
+        """Публикация в фоне: запрос не ждет ответа брокера"""
+        if self._queue is None:
+            logger.error("Event publisher not connected")
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Event queue is full, dropping {event.event_type} event")
+
+    async def _flush_loop(self, queue: asyncio.Queue) -> None:
+        """Забирает события из очереди и публикует их пачками"""
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < _BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            # Публикации пачки идут по каналу параллельно: подтверждения
+            # брокера ждем один раз на пачку, а не на каждое событие
+            await asyncio.gather(*(self._safe_publish(event) for event in batch))
+            for _ in batch:
+                queue.task_done()
+
+    async def _safe_publish(self, event) -> None:
+        try:
+            await self.publish(event)
+        except Exception as e:
+            # События не критичны для запроса - только логируем
+            logger.error(f"Failed to publish {event.event_type} event: {e}")
+
     async def close(self):
+        # Даем отправиться уже поставленным в очередь событиям
+        queue = self._queue
+        if self._flush_task and queue is not None:
+            try:
+                await asyncio.wait_for(queue.join(), _CLOSE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {queue.qsize()} unpublished events")
+            # Отмененная задача может быть внутри publish - дожидаемся ее
+            # до закрытия соединения
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        # Новые события больше некому отправлять - publish_nowait их отбросит
+        self._queue = None
         if self.connection:
             await self.connection.close()
             logger.info("Event publisher connection closed")
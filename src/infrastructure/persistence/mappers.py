@@ -1,20 +1,20 @@
 from __future__ import annotations
 
+from dataclasses import fields
+from operator import attrgetter
+
 from src.domain.entities import User
 from src.infrastructure.persistence.models import Users
 
+# Порядок полей User: один attrgetter читает их кортежем, а позиционный
+# вызов конструктора обходится без разбора именованных аргументов
+_DOMAIN_FIELDS = tuple(f.name for f in fields(User))
+_get_domain_fields = attrgetter(*_DOMAIN_FIELDS)
+
 
 def user_to_domain(user_model: Users) -> User:
     """Преобразование модели БД в доменную сущность"""
-    return User(
-        id=user_model.id,
-        email=user_model.email,
-        name=user_model.name,
-        password_hash=user_model.password_hash,
-        is_active=user_model.is_active,
-        created_at=user_model.created_at,
-        updated_at=user_model.updated_at
-    )
+    return User(*_get_domain_fields(user_model))
 
 
 def user_to_model(user: User) -> Users:
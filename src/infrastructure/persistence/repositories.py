@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from typing import Optional
+from dataclasses import replace
+from typing import Any, Optional, cast
 
-from sqlalchemy import select, delete
+from cachetools import TTLCache
+from sqlalchemy import CursorResult, select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.entities import User
-from src.infrastructure.persistence.models import Users
+from src.domain.repositories import UserRepository
+from src.infrastructure.persistence.models import Users, utcnow
 from src.infrastructure.persistence.mappers import user_to_domain, user_to_model
 
 
@@ -32,6 +35,14 @@ class SQLUserRepository:
         user_model = result.scalar_one_or_none()
         return user_to_domain(user_model) if user_model else None
     
+    async def exists_by_email(self, email: str) -> bool:
+        """Проверить, занят ли email"""
+        # Только первичный ключ: без загрузки хеша пароля, дат и ORM-объекта
+        result = await self.session.execute(
+            select(Users.id).where(Users.email == email).limit(1)
+        )
+        return result.first() is not None
+    
     async def create(self, user: User) -> User:
         """Создать нового пользователя"""
         user_model = user_to_model(user)
@@ -42,15 +53,116 @@ class SQLUserRepository:
     
     async def update(self, user: User) -> User:
         """Обновить пользователя"""
-        user_model = user_to_model(user)
-        await self.session.merge(user_model)
+        # Один UPDATE по изменяемым полям вместо merge (SELECT + UPDATE всех колонок)
+        now = utcnow()
+        await self.update_fields(
+            user.id,
+            updated_at=now,
+            email=user.email,
+            name=user.name,
+            password_hash=user.password_hash,
+            is_active=user.is_active,
+        )
+        return replace(user, updated_at=now)
+
+    async def update_fields(self, user_id: str, **changes: Any) -> bool:
+        """Обновить только переданные поля пользователя"""
+        changes.setdefault("updated_at", utcnow())
+        # UPDATE возвращает CursorResult - у него есть rowcount
+        result = cast(
+            CursorResult,
+            await self.session.execute(update(Users).where(Users.id == user_id).values(**changes)),
+        )
         await self.session.commit()
-        return user
+        return result.rowcount > 0
     
     async def delete(self, user_id: str) -> bool:
         """Удалить пользователя"""
-        result = await self.session.execute(
-            delete(Users).where(Users.id == user_id)
+        result = cast(
+            CursorResult, await self.session.execute(delete(Users).where(Users.id == user_id))
         )
         await self.session.commit()
         return result.rowcount > 0
+
+
+# Кеши уровня процесса: репозиторий создается на каждый запрос,
+# а повторные логины/refresh/me одного пользователя идут пачками.
+# Компромисс: кеш не общий между воркерами, поэтому смена password_hash
+# или is_active в другом процессе видна логину и refresh здесь только
+# по истечении TTL - до 60 секунд старый пароль/статус еще действуют
+_USER_CACHE_MAXSIZE = 5000
+_USER_CACHE_TTL_SECONDS = 60
+_users_by_id = TTLCache[str, User](maxsize=_USER_CACHE_MAXSIZE, ttl=_USER_CACHE_TTL_SECONDS)
+_users_by_email = TTLCache[str, User](maxsize=_USER_CACHE_MAXSIZE, ttl=_USER_CACHE_TTL_SECONDS)
+
+
+class CachedUserRepository:
+    """Репозиторий пользователей с коротким TTL-кешем по id и email"""
+
+    def __init__(self, repo: UserRepository):
+        self.repo = repo
+
+    async def get_by_id(self, user_id: str) -> Optional[User]:
+        """Получить пользователя по ID"""
+        user = _users_by_id.get(user_id)
+        if user is None:
+            user = await self.repo.get_by_id(user_id)
+            if user is None:
+                return None
+            self._remember(user)
+        # User неизменяем - кешированный экземпляр отдаем без копии
+        return user
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Получить пользователя по email"""
+        user = _users_by_email.get(email)
+        if user is None:
+            user = await self.repo.get_by_email(email)
+            if user is None:
+                return None
+            self._remember(user)
+        return user
+
+    async def exists_by_email(self, email: str) -> bool:
+        """Проверить, занят ли email"""
+        if email in _users_by_email:
+            return True
+        return await self.repo.exists_by_email(email)
+
+    async def create(self, user: User) -> User:
+        """Создать нового пользователя"""
+        saved = await self.repo.create(user)
+        self._forget(saved.id, saved.email)
+        return saved
+
+    async def update(self, user: User) -> User:
+        """Обновить пользователя"""
+        updated = await self.repo.update(user)
+        # Старый email снимется через запись по id, новый - передаем явно
+        self._forget(user.id, updated.email)
+        return updated
+
+    async def update_fields(self, user_id: str, **changes: Any) -> bool:
+        """Обновить только переданные поля пользователя"""
+        updated = await self.repo.update_fields(user_id, **changes)
+        self._forget(user_id)
+        return updated
+
+    async def delete(self, user_id: str) -> bool:
+        """Удалить пользователя"""
+        deleted = await self.repo.delete(user_id)
+        self._forget(user_id)
+        return deleted
+
+    @staticmethod
+    def _remember(user: User) -> None:
+        _users_by_id[user.id] = user
+        _users_by_email[user.email] = user
+
+    @staticmethod
+    def _forget(user_id: str, email: Optional[str] = None) -> None:
+        cached = _users_by_id.pop(user_id, None)
+        if cached is not None:
+            _users_by_email.pop(cached.email, None)
+        if email is not None:
+            _users_by_email.pop(email, None)
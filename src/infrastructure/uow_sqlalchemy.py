@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 from src.application.uow import UnitOfWork
 # from src.domain.repositories import UsersRepo
@@ -6,27 +8,46 @@ from src.application.uow import UnitOfWork
 
 class SQLAlchemyUoW(UnitOfWork):
 
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] | None = None):
         self._sf = session_factory
         self.session: AsyncSession | None = None
+        # Сессию, пришедшую извне (request-scoped), закрывает ее владелец
+        self._owns_session = True
 #         self.users: UsersRepo | None = None
 
-#     async def __aenter__(self):
-#         self.session = self._sf()
+    @classmethod
+    def from_existing_session(cls, session: AsyncSession) -> "SQLAlchemyUoW":
+        uow = cls()
+        uow.session = session
+        uow._owns_session = False
+        return uow
+
+    async def __aenter__(self) -> "SQLAlchemyUoW":
+        if self.session is None:
+            if self._sf is None:
+                raise RuntimeError("Session factory is not set")
+            self.session = self._sf()
 #         self.users = UsersRepoSQL(self.session)
-#         return self
-
-#     async def __aexit__(self, exc_type, exc, tb):
-#         try:
-#             if exc_type is None:
-#                 await self.session.commit()
-#             else:
-#                 await self.session.rollback()
-#         finally:
-#             await self.session.close()
-
-#     async def commit(self):
-#         await self.session.commit()
-
-#     async def rollback(self):
-#         await self.session.rollback()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                await self.rollback()
+        finally:
+            await self.close()
+
+    async def commit(self) -> None:
+        if self.session is not None:
+            await self.session.commit()
+
+    async def rollback(self) -> None:
+        if self.session is not None:
+            await self.session.rollback()
+
+    async def close(self) -> None:
+        if self.session is not None and self._owns_session:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,38 @@
+from dataclasses import replace
+from typing import Any, Optional
+
+from src.domain.entities import User
+
+
+class InMemoryUserRepository:
+    """Репозиторий пользователей в памяти"""
+
+    def __init__(self, *users: User) -> None:
+        self._users = {user.id: user for user in users}
+
+    async def get_by_id(self, user_id: str) -> Optional[User]:
+        return self._users.get(user_id)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return next((user for user in self._users.values() if user.email == email), None)
+
+    async def exists_by_email(self, email: str) -> bool:
+        return await self.get_by_email(email) is not None
+
+    async def create(self, user: User) -> User:
+        self._users[user.id] = user
+        return user
+
+    async def update(self, user: User) -> User:
+        self._users[user.id] = user
+        return user
+
+    async def update_fields(self, user_id: str, **changes: Any) -> bool:
+        user = self._users.get(user_id)
+        if user is None:
+            return False
+        self._users[user_id] = replace(user, **changes)
+        return True
+
+    async def delete(self, user_id: str) -> bool:
+        return self._users.pop(user_id, None) is not None
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from src.application.dto import LoginRequest
+from src.application.use_cases.auth_use_cases import LoginUseCase
+from src.core.config import Settings
+from src.domain.entities import User
+from src.domain.services import AuthService, JWTService, PasswordService
+from tests.fakes import InMemoryUserRepository
+
+PASSWORD = "correct-password"
+
+
+class SpyPasswordService(PasswordService):
+    """PasswordService, запоминающий, какая проверка выполнялась"""
+
+    def __init__(self) -> None:
+        # Минимальный cost bcrypt - тестам важен факт проверки, а не время
+        super().__init__(rounds=4, max_workers=1)
+        self.calls: list[str] = []
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        self.calls.append("verify")
+        return await super().verify_password(plain_password, hashed_password)
+
+    async def dummy_verify(self, plain_password: str) -> None:
+        self.calls.append("dummy")
+        await super().dummy_verify(plain_password)
+
+
+@pytest.fixture
+def password_service():
+    service = SpyPasswordService()
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def auth_service(password_service):
+    return AuthService(password_service, JWTService(Settings()))
+
+
+def make_user(password_service: PasswordService, is_active: bool = True) -> User:
+    return User(
+        id="user-1",
+        email="user@example.com",
+        name="User",
+        password_hash=asyncio.run(password_service.hash_password(PASSWORD)),
+        is_active=is_active,
+    )
+
+
+def test_missing_user_checks_dummy_hash(auth_service, password_service):
+    assert asyncio.run(auth_service.authenticate_user(None, PASSWORD)) is False
+    assert password_service.calls == ["dummy"]
+
+
+def test_inactive_user_checks_dummy_hash(auth_service, password_service):
+    user = make_user(password_service, is_active=False)
+    assert asyncio.run(auth_service.authenticate_user(user, PASSWORD)) is False
+    assert password_service.calls == ["dummy"]
+
+
+@pytest.mark.parametrize("password, expected", [(PASSWORD, True), ("wrong-password", False)])
+def test_active_user_checks_real_hash(auth_service, password_service, password, expected):
+    user = make_user(password_service)
+    assert asyncio.run(auth_service.authenticate_user(user, password)) is expected
+    assert password_service.calls == ["verify"]
+
+
+def test_login_unknown_email_spends_one_bcrypt_check(auth_service, password_service):
+    use_case = LoginUseCase(InMemoryUserRepository(), auth_service, auth_service.jwt_service)
+    request = LoginRequest(email="nobody@example.com", password=PASSWORD)
+    assert asyncio.run(use_case.execute(request)) is None
+    assert password_service.calls == ["dummy"]
+
+
+def test_login_wrong_password_spends_one_bcrypt_check(auth_service, password_service):
+    user = make_user(password_service)
+    use_case = LoginUseCase(InMemoryUserRepository(user), auth_service, auth_service.jwt_service)
+    request = LoginRequest(email=user.email, password="wrong-password")
+    assert asyncio.run(use_case.execute(request)) is None
+    assert password_service.calls == ["verify"]
@@ -0,0 +1,44 @@
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from src.domain.entities import User
+from src.infrastructure.persistence import repositories
+from src.infrastructure.persistence.repositories import CachedUserRepository
+from tests.fakes import InMemoryUserRepository
+
+USER = User(id="user-1", email="old@example.com", name="User", password_hash="hash")
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    repositories._users_by_id.clear()
+    repositories._users_by_email.clear()
+    yield
+    repositories._users_by_id.clear()
+    repositories._users_by_email.clear()
+
+
+def test_update_forgets_old_and_new_email():
+    repo = CachedUserRepository(InMemoryUserRepository(USER))
+    asyncio.run(repo.get_by_id(USER.id))
+    asyncio.run(repo.update(replace(USER, email="new@example.com")))
+
+    assert "old@example.com" not in repositories._users_by_email
+    assert "new@example.com" not in repositories._users_by_email
+    assert asyncio.run(repo.get_by_email("old@example.com")) is None
+
+
+def test_update_fields_forgets_cached_email():
+    repo = CachedUserRepository(InMemoryUserRepository(USER))
+    asyncio.run(repo.get_by_email(USER.email))
+    asyncio.run(repo.update_fields(USER.id, is_active=False))
+
+    user = asyncio.run(repo.get_by_email(USER.email))
+    assert user is not None and user.is_active is False
+
+
+def test_forget_without_cached_entries():
+    repo = CachedUserRepository(InMemoryUserRepository())
+    assert asyncio.run(repo.delete("missing")) is False
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Coroutine, cast
+
+import orjson
+from starlette.requests import Request
+
+from src.api.app import create_app
+from src.core.config import Settings
+from src.core.errors import AppError, ProblemJSONResponse
+
+
+def make_request() -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "path": "/api/v1/things",
+        "query_string": b"",
+        "headers": [],
+    })
+
+
+def handle(exc: Exception) -> ProblemJSONResponse:
+    app = create_app(Settings())
+    handler = app.exception_handlers[type(exc)]
+    response = handler(make_request(), exc)
+    return asyncio.run(cast(Coroutine[Any, Any, ProblemJSONResponse], response))
+
+
+def test_app_error_renders_problem_json():
+    exc = AppError(type="not_found", title="Not found", detail="missing", status_code=404)
+    response = handle(exc)
+
+    assert response.status_code == 404
+    assert response.media_type == "application/problem+json"
+    assert orjson.loads(response.body) == {
+        "type": "/problems/not_found",
+        "title": "Not found",
+        "status": 404,
+        "detail": "missing",
+        "instance": "http://testserver/api/v1/things",
+    }
+
+
+def test_app_error_keeps_explicit_instance_and_extra():
+    exc = AppError(type="conflict", title="Conflict", instance="/users/1", extra={"field": "email"})
+    problem = orjson.loads(handle(exc).body)
+
+    assert problem["instance"] == "/users/1"
+    assert problem["field"] == "email"
+
+
+def test_value_error_renders_bad_request():
+    response = handle(ValueError("bad value"))
+
+    assert response.status_code == 400
+    assert orjson.loads(response.body)["detail"] == "bad value"
@@ -0,0 +1,71 @@
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.core.config import Settings
+from src.domain.entities import User
+from src.domain.services import JWTService
+
+# Ключ не короче дайджеста HS512 - PyJWT не предупреждает о слабом ключе
+SECRET = "s" * 64
+USER = User(id="user-1", email="user@example.com", name="User", password_hash="hash")
+PAYLOAD = {"sub": "user-1", "email": "user@example.com", "exp": 4102444800, "type": "access"}
+
+
+def make_service(algorithm: str, secret: str = SECRET) -> JWTService:
+    return JWTService(Settings(jwt_secret_key=secret, jwt_algorithm=algorithm))
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS384", "HS512"])
+def test_hmac_encode_matches_pyjwt(algorithm):
+    service = make_service(algorithm)
+    assert service._encode(PAYLOAD) == jwt.encode(PAYLOAD, SECRET, algorithm=algorithm)
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS384", "HS512"])
+def test_token_pair_round_trip(algorithm):
+    service = make_service(algorithm)
+    tokens = service.create_token_pair(USER)
+
+    access = service.verify_access_token(tokens.access_token)
+    assert access is not None
+    assert access["sub"] == USER.id
+    assert access["email"] == USER.email
+    assert access["type"] == "access"
+
+    refresh = service.verify_refresh_token(tokens.refresh_token)
+    assert refresh is not None
+    assert refresh["sub"] == USER.id
+    assert refresh["type"] == "refresh"
+
+    # Тип токена проверяется: refresh не принимается как access и наоборот
+    assert service.verify_access_token(tokens.refresh_token) is None
+    assert service.verify_refresh_token(tokens.access_token) is None
+
+
+def test_non_ascii_claims_round_trip():
+    # orjson пишет UTF-8 без \u-экранирования - байты отличаются от PyJWT,
+    # но токен остается валидным
+    service = make_service("HS256")
+    payload = {**PAYLOAD, "email": "пользователь@пример.рф"}
+    assert service.verify_access_token(service._encode(payload)) == payload
+
+
+def test_tampered_signature_rejected():
+    token = make_service("HS256")._encode(PAYLOAD)
+    assert make_service("HS256", secret="x" * 64).verify_access_token(token) is None
+
+
+def test_non_hmac_algorithm_falls_back_to_pyjwt():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    service = make_service("RS256", secret=private_pem)
+
+    token = service._encode(PAYLOAD)
+    assert token == jwt.encode(PAYLOAD, private_pem, algorithm="RS256")
+    assert jwt.decode(token, private_key.public_key(), algorithms=["RS256"]) == PAYLOAD